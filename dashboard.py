@@ -1,8 +1,11 @@
+import html
 import streamlit as st
 import folium
-from streamlit_folium import st_folium
-from vessel_analysis import (analyze_vessel, CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS, BRIDGE_LAT, BRIDGE_LON,
-                             predict_trajectory, assess_collision_risk, calculate_allision_probability)
+import numpy as np
+import pandas as pd
+from vessel_analysis import (analyze_vessel_arrays, analyses_from_arrays, CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS, BRIDGE_LAT, BRIDGE_LON,
+                             predict_trajectory, assess_collision_risk, calculate_allision_probability,
+                             filter_monitored_vessels)
 
 # Page configuration
 st.set_page_config(
@@ -38,53 +41,121 @@ def get_ship_color(risk_level):
     }
     return colors.get(risk_level, 'blue')
 
+# Emoji shown next to each threat level in vessel lists
+RISK_EMOJIS = {
+    'ALARM': '🔴',
+    'ELEVATED MONITORING': '🟠',
+    'MONITOR': '🟡',
+    'NEGLIGIBLE THREAT': '🟢'
+}
+
+def vessel_popup_html(ship):
+    """Build the simplified map popup for an analyzed vessel"""
+    analysis = ship['analysis']
+    collision_risk = ship.get('collision_risk', {})
+    risk_level = collision_risk.get('risk_level', 'NEGLIGIBLE THREAT')
+
+    # AIS text fields are user-supplied, so escape them before building HTML
+    name = html.escape(str(ship['name']))
+    ship_type = html.escape(str(ship.get('ShipType', ship.get('type', 'Unknown'))))
+    approaching = collision_risk.get('approaching', False)
+    time_to_arrival = collision_risk.get('cpa_time_minutes', 0)
+
+    # Determine if vessel can endanger bridge
+    can_endanger = "⚠️ YES" if analysis['dc_ratio'] >= 1.0 and not analysis['will_ground'] else "✓ No"
+
+    # Build time to arrival text
+    if ship['Sog'] < 0.05:
+        arrival_text = "Stationary"
+    elif approaching:
+        arrival_text = f"{time_to_arrival:.0f} minutes"
+    else:
+        arrival_text = "Moving away"
+
+    return f"""
+    <div style="width: 280px">
+        <h4>{name}</h4>
+        <b>Threat Level:</b> {risk_level}<br>
+        <b>Type:</b> {ship_type}<br>
+        <b>Speed:</b> {ship['Sog']:.1f} knots | <b>Course:</b> {ship['Cog']:.1f}°<br>
+        <b>Distance:</b> {analysis['distance_from_bridge_nm']:.2f} nm<br>
+        <b>Time to Arrival:</b> {arrival_text}<br>
+        <hr>
+        <b>Can endanger bridge at current speed?</b> {can_endanger}
+    </div>
+    """
+
+def analyze_ships(ships_data):
+    """
+    Attach analysis, trajectory, collision risk and popup HTML to each vessel
+
+    Returns:
+        ships: The vessel dictionaries, in input order
+        analysis_arrays: Structured array of batch analysis results, one row per vessel
+    """
+    analysis_arrays = analyze_vessel_arrays(ships_data)
+    for ship, analysis in zip(ships_data, analyses_from_arrays(analysis_arrays)):
+        ship['analysis'] = analysis
+        ship['trajectory'] = predict_trajectory(ship)
+        ship['collision_risk'] = assess_collision_risk(ship, analysis)
+        ship['allision_probability'] = calculate_allision_probability(
+            ship, analysis, ship['collision_risk'])
+        ship['popup_html'] = vessel_popup_html(ship)
+
+    return ships_data, analysis_arrays
+
+@st.cache_data(max_entries=1)
+def load_ships(json_file, file_mtime):
+    """
+    Load and analyze ships from JSON file
+
+    Cached on the file modification time, so reruns reuse the analysis
+    until update_ships.py writes a new file.
+    """
+    import orjson
+    import datetime
+    from zoneinfo import ZoneInfo
+
+    # Load ships from JSON
+    with open(json_file, 'rb') as f:
+        data = orjson.loads(f.read())
+
+    # Check if data has new structure with timestamp
+    if isinstance(data, dict) and 'timestamp' in data and 'vessels' in data:
+        # New format with timestamp
+        update_time = datetime.datetime.fromisoformat(data['timestamp'])
+        ships_data = data['vessels']
+    else:
+        # Old format (just array of vessels) - use file modification time
+        update_time = datetime.datetime.fromtimestamp(file_mtime, tz=ZoneInfo('America/New_York'))
+        ships_data = data
+
+    # Drop vessels outside the monitoring area before analysis
+    ships_data = filter_monitored_vessels(ships_data)
+
+    ships, analysis_arrays = analyze_ships(ships_data)
+
+    return ships, analysis_arrays, update_time
+
 def get_real_ships():
     """Load ships from JSON file (updated manually)"""
-    import json
     import os
-    import datetime
-    from zoneinfo import ZoneInfo
 
     json_file = 'current_ships.json'
 
     # Check if file exists
     if not os.path.exists(json_file):
         st.warning("⚠️ No ship data file found. Run 'python3 update_ships.py' to fetch current ships.")
-        return get_mock_ships_fallback(), None
+        return *get_mock_ships_fallback(), None
 
     try:
-        # Load ships from JSON
-        with open(json_file, 'r') as f:
-            data = json.load(f)
-
-        # Check if data has new structure with timestamp
-        if isinstance(data, dict) and 'timestamp' in data and 'vessels' in data:
-            # New format with timestamp
-            update_time = datetime.datetime.fromisoformat(data['timestamp'])
-            ships_data = data['vessels']
-        else:
-            # Old format (just array of vessels) - use file modification time
-            file_time = os.path.getmtime(json_file)
-            update_time = datetime.datetime.fromtimestamp(file_time, tz=ZoneInfo('America/New_York'))
-            ships_data = data
-
-        ships = []
-        for ship in ships_data:
-            # Analyze vessel
-            analysis = analyze_vessel(ship)
-            ship['analysis'] = analysis
-            ship['trajectory'] = predict_trajectory(ship)
-            ship['collision_risk'] = assess_collision_risk(ship, analysis)
-            ship['allision_probability'] = calculate_allision_probability(
-                ship, analysis, ship['collision_risk'])
-            ships.append(ship)
-
-        return ships, update_time
+        return load_ships(json_file, os.path.getmtime(json_file))
 
     except Exception as e:
         st.error(f"Error loading ship data: {e}")
-        return get_mock_ships_fallback(), None
+        return *get_mock_ships_fallback(), None
 
+@st.cache_data
 def get_mock_ships_fallback():
     """Fallback mock data if API fails"""
     mock_ships = [
@@ -98,28 +169,178 @@ def get_mock_ships_fallback():
          'Dimension': {'A': 40, 'B': 40, 'C': 8, 'D': 8}}
     ]
 
-    for ship in mock_ships:
-        analysis = analyze_vessel(ship)
-        ship['analysis'] = analysis
-        ship['trajectory'] = predict_trajectory(ship)
-        ship['collision_risk'] = assess_collision_risk(ship, analysis)
-        ship['allision_probability'] = calculate_allision_probability(
-            ship, analysis, ship['collision_risk'])
+    return analyze_ships(mock_ships)
 
-    return mock_ships
+def vessel_details_html(ship):
+    """Build the details panel for one vessel as HTML"""
+    analysis = ship['analysis']
+    collision_risk = ship.get('collision_risk', {})
 
-# Get ships
-with st.spinner("Loading vessel data..."):
-    ships, update_time = get_real_ships()
+    # Get threat level from collision risk
+    risk_level = collision_risk.get('risk_level', 'NEGLIGIBLE THREAT')
+    risk_emoji = RISK_EMOJIS.get(risk_level, '⚪')
 
-with col1:
-    st.subheader("📍 Map of Bridge, Piers, Vessels, and Trajectories")
+    lines = []
+
+    # VESSEL DATA (from AIS)
+    lines.append("<b>VESSEL DATA</b> <i>(from AIS transponder)</i>")
+    ship_type = html.escape(str(ship.get('ShipType', ship.get('type', 'Unknown'))))
+    heading = ship.get('Heading', 'N/A')  # AIS heading if available
+    course = ship.get('Cog', 0)
+    speed = ship.get('Sog', 0)
+
+    # Calculate dimensions from AIS
+    dim = ship.get('Dimension', {})
+    length_m = dim.get('A', 0) + dim.get('B', 0)
+    beam_m = dim.get('C', 0) + dim.get('D', 0)
+    length_ft = length_m * 3.28084
+    beam_ft = beam_m * 3.28084
+
+    lines.append(f"• <b>Type:</b> {ship_type}")
+    if heading != 'N/A':
+        lines.append(f"• <b>Speed:</b> {speed:.1f} knots | <b>Course:</b> {course:.1f}° | <b>Heading:</b> {heading}°")
+    else:
+        lines.append(f"• <b>Speed:</b> {speed:.1f} knots | <b>Course:</b> {course:.1f}°")
+
+    if length_ft > 0 and beam_ft > 0:
+        lines.append(f"• <b>Dimensions:</b> {length_ft:.0f} ft × {beam_ft:.0f} ft")
+    lines.append(f"• <b>MMSI:</b> {html.escape(str(ship['mmsi']))}")
+
+    lines.append("")
+
+    # ESTIMATED VESSEL PROPERTIES
+    lines.append("<b>ESTIMATED VESSEL PROPERTIES</b>")
+    lines.append(f"• <b>Displacement:</b> ~{analysis['dwt_tons']:,} tons <i>(estimated from dimensions)</i>")
+    lines.append(f"• <b>Draft:</b> {analysis['vessel_draft_ft']:.0f} ft <i>(from AIS - crew reported)</i>")
+
+    lines.append("<hr>")
+
+    # CALCULATIONS
+    lines.append("<b>CALCULATIONS</b>")
+
+    # Trajectory Analysis
+    lines.append("<b>Trajectory Analysis</b>")
+    lines.append(f"• Distance to bridge: {analysis['distance_from_bridge_nm']:.2f} nm")
+    lines.append(f"• Closest pier: {analysis['pier_name']}")
+
+    # Approaching status
+    approaching = collision_risk.get('approaching', False)
+
+    if speed < 0.5:
+        lines.append("• Status: <b>Stationary</b>")
+    elif approaching:
+        lines.append("• Status: <b>Approaching bridge</b>")
+    else:
+        lines.append("• Status: <b>Moving away from bridge</b>")
+
+    # CPA
+    cpa_distance = collision_risk.get('cpa_distance_nm', 0)
+    lines.append(f"• Will pass: {cpa_distance:.2f} nm from pier")
 
+    # Time to Arrival
+    if approaching:
+        cpa_time = collision_risk.get('cpa_time_minutes', 0)
+        lines.append(f"• Time to Arrival: {cpa_time:.0f} minutes")
+    else:
+        lines.append("• Time to Arrival: Not applicable (moving away)")
+
+    # Grounding risk
+    ukc = analysis['ukc_ft']
+    depth = analysis['water_depth_ft']
+    draft = analysis['vessel_draft_ft']
+    if ukc >= 10:
+        lines.append(f"• Grounding risk: None (depth {depth:.0f} ft, draft {draft:.0f} ft, clearance +{ukc:.0f} ft)")
+    elif ukc >= 0:
+        lines.append(f"• Grounding risk: Low (depth {depth:.0f} ft, draft {draft:.0f} ft, clearance +{ukc:.0f} ft)")
+    else:
+        lines.append(f"• Grounding risk: <b>Will ground</b> (depth {depth:.0f} ft, draft {draft:.0f} ft, deficit {ukc:.0f} ft)")
+
+    lines.append("")
+
+    # Impact Assessment (only if won't ground)
+    if not analysis['will_ground']:
+        lines.append("<b>Impact Assessment</b> <i>(if collision occurs)</i>")
+        lines.append(f"• Vessel demand: {analysis['impact_force_kips']:,.0f} kips <i>(at current speed)</i>")
+        lines.append(f"• Pier lateral capacity: {analysis['pier_lateral_capacity_kips']:,} kips <i>(pending structural analysis)</i>")
+        lines.append(f"• Demand/Capacity ratio: {analysis['dc_ratio']:.2f}")
+
+        # Can endanger bridge?
+        if analysis['dc_ratio'] >= 1.0:
+            lines.append("• <b>Can endanger bridge at current speed?</b> ⚠️ <b>YES</b> (impact exceeds pier capacity)")
+        else:
+            lines.append("• <b>Can endanger bridge at current speed?</b> ✓ No (impact within pier capacity)")
+    else:
+        lines.append("<b>Impact Assessment</b>")
+        lines.append("• Vessel will ground before reaching pier - no collision possible")
+
+    return (
+        '<div style="border: 1px solid rgba(250, 250, 250, 0.2); border-radius: 0.5rem; '
+        'padding: 0.5rem 1rem; margin-bottom: 0.5rem;">'
+        f'<b>{risk_emoji} {html.escape(str(ship["name"]))} - {risk_level}</b><br><br>'
+        f'{"<br>".join(lines)}'
+        '</div>'
+    )
+
+@st.cache_data(max_entries=1)
+def build_vessel_table(sorted_ships, sorted_analysis_arrays):
+    """
+    Summarize vessels as a DataFrame, one row per vessel (cached on the ship data)
+
+    Numeric analysis columns are taken straight from the structured
+    analysis array rows, in the same order as sorted_ships.
+    """
+    risk_levels = [ship.get('collision_risk', {}).get('risk_level', 'NEGLIGIBLE THREAT') for ship in sorted_ships]
+    return pd.DataFrame({
+        'threat': [RISK_EMOJIS.get(risk_level, '⚪') for risk_level in risk_levels],
+        'vessel': [ship['name'] for ship in sorted_ships],
+        'threat_level': risk_levels,
+        'distance_nm': sorted_analysis_arrays['distance_from_bridge_nm'],
+        'speed_kts': [ship.get('Sog', 0) for ship in sorted_ships],
+        'dc_ratio': sorted_analysis_arrays['dc_ratio']
+    })
+
+@st.cache_resource
+def get_pier_geojson():
+    """Pier locations as a GeoJSON FeatureCollection (built once, piers are constant)"""
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [pier_data['lon'], pier_data['lat']]},
+                'properties': {
+                    'name': pier_data['name'],
+                    'tooltip': f"{pier_data['name']}<br>Lateral Capacity: {pier_data['lateral_capacity_kips']} kips"
+                }
+            }
+            for pier_data in CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS.values()
+        ]
+    }
+
+@st.fragment
+def show_vessel_details(sorted_ships):
+    """
+    Vessel picker with the details panel for the selected vessel
+
+    Runs as a fragment, so changing the selection reruns only this
+    section instead of the whole dashboard.
+    """
+    selected_index = st.selectbox(
+        "Vessel details",
+        range(len(sorted_ships)),
+        format_func=lambda i: f"{RISK_EMOJIS.get(sorted_ships[i].get('collision_risk', {}).get('risk_level'), '⚪')} "
+                              f"{sorted_ships[i]['name']}"
+    )
+    st.markdown(vessel_details_html(sorted_ships[selected_index]), unsafe_allow_html=True)
+
+def create_map(ships):
+    """Build the Folium map of bridge, piers, vessels, and trajectories"""
     # Create map centered on Chesapeake Bay Bridge
     m = folium.Map(
         location=[BRIDGE_LAT, BRIDGE_LON],
         zoom_start=12,
-        tiles=None  # Start with no tiles, add custom layers below
+        tiles=None,  # Start with no tiles, add custom layers below
+        prefer_canvas=True  # Draw piers, trajectories and stationary vessels on one canvas instead of SVG/DOM nodes
     )
 
     # Add OpenStreetMap as base layer
@@ -160,162 +381,218 @@ with col1:
         icon=folium.Icon(color='blue', icon='bridge', prefix='fa')
     ).add_to(m)
 
-    # Add pier markers (BLUE - infrastructure)
-    for pier_id, pier_data in CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS.items():
-        folium.CircleMarker(
-            location=[pier_data['lat'], pier_data['lon']],
-            radius=10,
-            popup=pier_data['name'],
-            tooltip=f"{pier_data['name']}<br>Lateral Capacity: {pier_data['lateral_capacity_kips']} kips",
-            color='darkblue',
-            fill=True,
-            fillColor='blue',
-            fillOpacity=0.7
-        ).add_to(m)
+    # Add pier markers (BLUE - infrastructure) as a single GeoJSON layer
+    folium.GeoJson(
+        get_pier_geojson(),
+        name='Piers',
+        control=False,
+        marker=folium.CircleMarker(radius=10, fill=True),
+        style_function=lambda feature: {
+            'color': 'darkblue',
+            'fillColor': 'blue',
+            'fillOpacity': 0.7
+        },
+        popup=folium.GeoJsonPopup(fields=['name'], labels=False),
+        tooltip=folium.GeoJsonTooltip(fields=['tooltip'], labels=False)
+    ).add_to(m)
+
+    # Color mapping for consistent display
+    color_css_map = {
+        'red': '#dc3545',
+        'orange': '#fd7e14',
+        'yellow': '#ffeb3b',  # Brighter yellow for better visibility
+        'green': '#28a745',
+        'blue': '#007bff',
+        'gray': '#6c757d'
+    }
+
+    # RGBA color mapping for pulse effect
+    color_rgba_map = {
+        'red': '220, 53, 69',
+        'orange': '253, 126, 20',
+        'yellow': '255, 235, 59',  # Brighter yellow for better visibility
+        'green': '40, 167, 69',
+        'blue': '0, 123, 255',
+        'gray': '108, 117, 125'
+    }
+
+    # Pulsing animation for moving vessels, emitted once per color
+    # instead of once per vessel
+    pulse_css = "".join(f"""
+        @keyframes pulse-{color} {{
+            0% {{ box-shadow: 0 0 0 0 rgba({color_rgba}, 0.7); }}
+            50% {{ box-shadow: 0 0 0 10px rgba({color_rgba}, 0); }}
+            100% {{ box-shadow: 0 0 0 0 rgba({color_rgba}, 0); }}
+        }}
+        .vessel-marker-{color} {{
+            width: 30px;
+            height: 30px;
+            border-radius: 50%;
+            background: {color_css_map[color]};
+            animation: pulse-{color} 2s infinite;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            color: white;
+            font-weight: bold;
+        }}
+    """ for color, color_rgba in color_rgba_map.items())
+    m.get_root().header.add_child(folium.Element(f"<style>{pulse_css}</style>"))
+
+    # All vessel markers and trajectories share a single layer
+    vessel_layer = folium.FeatureGroup(name='Vessels', control=False).add_to(m)
 
     # Add ships to map with trajectories
+    trajectory_features = []
+    projection_features = []
+    stationary_features = []
     if ships:
         for ship in ships:
-            analysis = ship['analysis']
             trajectory = ship.get('trajectory', [])
             allision_prob = ship.get('allision_probability', {})
             collision_risk = ship.get('collision_risk', {})
 
             # Get color based on NEW threat level system
             risk_level = collision_risk.get('risk_level', 'NEGLIGIBLE THREAT')
+            name = html.escape(str(ship['name']))
             color = get_ship_color(risk_level)
-
-            # Color mapping for consistent display
-            color_css_map = {
-                'red': '#dc3545',
-                'orange': '#fd7e14',
-                'yellow': '#ffeb3b',  # Brighter yellow for better visibility
-                'green': '#28a745',
-                'blue': '#007bff',
-                'gray': '#6c757d'
-            }
             color_css = color_css_map.get(color, '#007bff')
 
-            # Draw trajectory line if vessel is moving
+            # Collect trajectory line if vessel is moving (drawn together below)
             if ship['Sog'] > 0.05 and trajectory:
-                trajectory_coords = [[ship['Latitude'], ship['Longitude']]]
+                trajectory_coords = [[ship['Longitude'], ship['Latitude']]]
                 for point in trajectory:
-                    trajectory_coords.append([point['latitude'], point['longitude']])
-
-                folium.PolyLine(
-                    trajectory_coords,
-                    color=color_css,
-                    weight=2,
-                    opacity=0.6,
-                    dash_array='5, 5',
-                    popup=f"{ship['name']} - Predicted Path"
-                ).add_to(m)
-
-                # Add arrow markers at trajectory points showing direction of travel
-                for point in trajectory:
-                    # Create arrow marker pointing in direction of course
-                    arrow_icon = folium.DivIcon(html=f"""
-                        <div style="transform: rotate({ship['Cog']}deg); font-size: 20px; color: {color_css};">
-                            ▲
-                        </div>
-                    """)
-
-                    folium.Marker(
-                        [point['latitude'], point['longitude']],
-                        icon=arrow_icon,
-                        popup=f"{ship['name']}<br>+{point['time_minutes']} min linear projection"
-                    ).add_to(m)
-
-            # Create simplified popup
-            ship_type = ship.get('ShipType', ship.get('type', 'Unknown'))
-            approaching = collision_risk.get('approaching', False)
-            time_to_arrival = collision_risk.get('cpa_time_minutes', 0)
-
-            # Determine if vessel can endanger bridge
-            can_endanger = "⚠️ YES" if analysis['dc_ratio'] >= 1.0 and not analysis['will_ground'] else "✓ No"
-
-            # Build time to arrival text
-            if ship['Sog'] < 0.05:
-                arrival_text = "Stationary"
-            elif approaching:
-                arrival_text = f"{time_to_arrival:.0f} minutes"
-            else:
-                arrival_text = "Moving away"
-
-            popup_html = f"""
-            <div style="width: 280px">
-                <h4>{ship['name']}</h4>
-                <b>Threat Level:</b> {risk_level}<br>
-                <b>Type:</b> {ship_type}<br>
-                <b>Speed:</b> {ship['Sog']:.1f} knots | <b>Course:</b> {ship['Cog']:.1f}°<br>
-                <b>Distance:</b> {analysis['distance_from_bridge_nm']:.2f} nm<br>
-                <b>Time to Arrival:</b> {arrival_text}<br>
-                <hr>
-                <b>Can endanger bridge at current speed?</b> {can_endanger}
-            </div>
-            """
+                    trajectory_coords.append([point['longitude'], point['latitude']])
+
+                trajectory_features.append({
+                    'type': 'Feature',
+                    'geometry': {'type': 'LineString', 'coordinates': trajectory_coords},
+                    'properties': {
+                        'color': color_css,
+                        'popup': f"{name} - Predicted Path"
+                    }
+                })
+
+                # Collect intermediate projection points along the path (drawn together below)
+                for point in trajectory[:-1]:
+                    projection_features.append({
+                        'type': 'Feature',
+                        'geometry': {'type': 'Point', 'coordinates': [point['longitude'], point['latitude']]},
+                        'properties': {
+                            'color': color_css,
+                            'popup': f"{name}<br>+{point['time_minutes']} min linear projection"
+                        }
+                    })
+
+                # Arrow at the end of the path pointing in direction of course
+                end_point = trajectory[-1]
+                arrow_icon = folium.DivIcon(html=f"""
+                    <div style="transform: rotate({ship['Cog']}deg); font-size: 20px; color: {color_css};">
+                        ▲
+                    </div>
+                """)
+
+                folium.Marker(
+                    [end_point['latitude'], end_point['longitude']],
+                    icon=arrow_icon,
+                    popup=f"{name}<br>+{end_point['time_minutes']} min linear projection"
+                ).add_to(vessel_layer)
 
             # Create marker with pulsing animation for moving vessels
             is_moving = ship['Sog'] > 0.05
 
-            # RGBA color mapping for pulse effect
-            color_rgba_map = {
-                'red': '220, 53, 69',
-                'orange': '253, 126, 20',
-                'yellow': '255, 235, 59',  # Brighter yellow for better visibility
-                'green': '40, 167, 69',
-                'blue': '0, 123, 255',
-                'gray': '108, 117, 125'
-            }
-            color_rgba = color_rgba_map.get(color, '0, 123, 255')
-
             if is_moving:
-                # Use custom DivIcon with pulsing animation for moving vessels
-                # Create unique ID for this vessel to avoid CSS conflicts
-                vessel_id = ship.get('mmsi', '').replace('.', '_')
+                # Use custom DivIcon with the shared pulsing animation for moving vessels
+                pulse_color = color if color in color_rgba_map else 'blue'
                 icon_html = f"""
                 <div style="position: relative;">
-                    <style>
-                        @keyframes pulse-{vessel_id} {{
-                            0% {{ box-shadow: 0 0 0 0 rgba({color_rgba}, 0.7); }}
-                            50% {{ box-shadow: 0 0 0 10px rgba({color_rgba}, 0); }}
-                            100% {{ box-shadow: 0 0 0 0 rgba({color_rgba}, 0); }}
-                        }}
-                        .marker-{vessel_id} {{
-                            width: 30px;
-                            height: 30px;
-                            border-radius: 50%;
-                            background: {color_css};
-                            animation: pulse-{vessel_id} 2s infinite;
-                            display: flex;
-                            align-items: center;
-                            justify-content: center;
-                            color: white;
-                            font-weight: bold;
-                        }}
-                    </style>
-                    <div class="marker-{vessel_id}">
+                    <div class="vessel-marker-{pulse_color}">
                         <i class="fa fa-ship"></i>
                     </div>
                 </div>
                 """
-                marker_icon = folium.DivIcon(html=icon_html)
-            else:
-                # Static icon for stationary vessels (anchor symbol in light green)
-                marker_icon = folium.Icon(color='lightgreen', icon='anchor', prefix='fa')
 
-            folium.Marker(
-                [ship['Latitude'], ship['Longitude']],
-                popup=folium.Popup(popup_html, max_width=350),
-                tooltip=f"{ship['name']} - {risk_level}",
-                icon=marker_icon
-            ).add_to(m)
+                folium.Marker(
+                    [ship['Latitude'], ship['Longitude']],
+                    popup=folium.Popup(ship['popup_html'], max_width=350),
+                    tooltip=f"{name} - {risk_level}",
+                    icon=folium.DivIcon(html=icon_html)
+                ).add_to(vessel_layer)
+            else:
+                # Collect stationary vessel (drawn together below)
+                stationary_features.append({
+                    'type': 'Feature',
+                    'geometry': {'type': 'Point', 'coordinates': [ship['Longitude'], ship['Latitude']]},
+                    'properties': {
+                        'popup': ship['popup_html'],
+                        'tooltip': f"{name} - {risk_level}"
+                    }
+                })
+
+    # Draw all predicted paths as one GeoJSON layer on the canvas
+    if trajectory_features:
+        folium.GeoJson(
+            {'type': 'FeatureCollection', 'features': trajectory_features},
+            style_function=lambda feature: {
+                'color': feature['properties']['color'],
+                'weight': 2,
+                'opacity': 0.6,
+                'dashArray': '5, 5'
+            },
+            popup=folium.GeoJsonPopup(fields=['popup'], labels=False)
+        ).add_to(vessel_layer)
+
+    # Draw all projection points as one GeoJSON layer on the canvas
+    if projection_features:
+        folium.GeoJson(
+            {'type': 'FeatureCollection', 'features': projection_features},
+            marker=folium.CircleMarker(radius=4, fill=True),
+            style_function=lambda feature: {
+                'color': feature['properties']['color'],
+                'fillColor': feature['properties']['color'],
+                'fillOpacity': 0.9
+            },
+            popup=folium.GeoJsonPopup(fields=['popup'], labels=False)
+        ).add_to(vessel_layer)
+
+    # Draw all stationary vessels (light green) as one GeoJSON layer on the canvas
+    if stationary_features:
+        folium.GeoJson(
+            {'type': 'FeatureCollection', 'features': stationary_features},
+            marker=folium.CircleMarker(radius=8, fill=True),
+            style_function=lambda feature: {
+                'color': 'darkgreen',
+                'fillColor': 'lightgreen',
+                'fillOpacity': 0.9
+            },
+            popup=folium.GeoJsonPopup(fields=['popup'], labels=False, max_width=350),
+            tooltip=folium.GeoJsonTooltip(fields=['tooltip'], labels=False)
+        ).add_to(vessel_layer)
 
     # Add layer control to toggle between map layers (must be added last)
     folium.LayerControl(position='topleft', collapsed=True).add_to(m)
 
+    return m
+
+@st.cache_data(max_entries=1)
+def build_map_html(ships):
+    """
+    Render the map to HTML
+
+    Cached on the ship data, so reruns with unchanged vessels skip
+    rebuilding and re-rendering the Folium map.
+    """
+    return create_map(ships).get_root().render()
+
+# Get ships
+with st.spinner("Loading vessel data..."):
+    ships, analysis_arrays, update_time = get_real_ships()
+
+with col1:
+    st.subheader("📍 Map of Bridge, Piers, Vessels, and Trajectories")
+
     # Display map
-    st_folium(m, width=700, height=600)
+    st.iframe(build_map_html(ships), width=700, height=600)
 
     # Data freshness note under the map
     st.markdown("---")
@@ -338,11 +615,17 @@ with col2:
     st.subheader("⚠️ Threat Assessment")
 
     if ships:
-        # Count vessels in each category
-        alarm_count = sum(1 for s in ships if s.get('collision_risk', {}).get('risk_level') == 'ALARM')
-        elevated_count = sum(1 for s in ships if s.get('collision_risk', {}).get('risk_level') == 'ELEVATED MONITORING')
-        monitor_count = sum(1 for s in ships if s.get('collision_risk', {}).get('risk_level') == 'MONITOR')
-        negligible_count = sum(1 for s in ships if s.get('collision_risk', {}).get('risk_level') == 'NEGLIGIBLE THREAT')
+        # Count vessels in each category (single pass over ships)
+        risk_counts = {'ALARM': 0, 'ELEVATED MONITORING': 0, 'MONITOR': 0, 'NEGLIGIBLE THREAT': 0}
+        for s in ships:
+            risk_level = s.get('collision_risk', {}).get('risk_level')
+            if risk_level in risk_counts:
+                risk_counts[risk_level] += 1
+
+        alarm_count = risk_counts['ALARM']
+        elevated_count = risk_counts['ELEVATED MONITORING']
+        monitor_count = risk_counts['MONITOR']
+        negligible_count = risk_counts['NEGLIGIBLE THREAT']
 
         # Determine current overall status (highest priority with vessels)
         if alarm_count > 0:
@@ -391,122 +674,31 @@ with col2:
             'NEGLIGIBLE THREAT': 4
         }
 
-        sorted_ships = sorted(ships, key=lambda s: (
-            threat_priority.get(s.get('collision_risk', {}).get('risk_level', 'NEGLIGIBLE THREAT'), 999),
-            s['analysis']['distance_to_pier_nm']
-        ))
-
-        for ship in sorted_ships:
-            analysis = ship['analysis']
-            collision_risk = ship.get('collision_risk', {})
-
-            # Get threat level from collision risk
-            risk_level = collision_risk.get('risk_level', 'NEGLIGIBLE THREAT')
-            risk_emoji_map = {
-                'ALARM': '🔴',
-                'ELEVATED MONITORING': '🟠',
-                'MONITOR': '🟡',
-                'NEGLIGIBLE THREAT': '🟢'
+        risk_priorities = np.array([
+            threat_priority.get(s.get('collision_risk', {}).get('risk_level', 'NEGLIGIBLE THREAT'), 999)
+            for s in ships
+        ])
+
+        # Stable sort on the analysis column (last key is the primary key)
+        order = np.lexsort((analysis_arrays['distance_to_pier_nm'], risk_priorities))
+        sorted_ships = [ships[i] for i in order]
+
+        # One table for all vessels instead of a widget tree per vessel
+        st.dataframe(
+            build_vessel_table(sorted_ships, analysis_arrays[order]),
+            hide_index=True,
+            column_config={
+                'threat': st.column_config.TextColumn('', width='small'),
+                'vessel': 'Vessel',
+                'threat_level': 'Threat Level',
+                'distance_nm': st.column_config.NumberColumn('Distance (nm)', format='%.2f'),
+                'speed_kts': st.column_config.NumberColumn('Speed (kts)', format='%.1f'),
+                'dc_ratio': st.column_config.NumberColumn('D/C', format='%.2f')
             }
-            risk_emoji = risk_emoji_map.get(risk_level, '⚪')
-
-            with st.expander(f"{risk_emoji} {ship['name']} - {risk_level}", expanded=False):
-
-                # VESSEL DATA (from AIS)
-                st.markdown("**VESSEL DATA** *(from AIS transponder)*")
-                ship_type = ship.get('ShipType', ship.get('type', 'Unknown'))
-                heading = ship.get('Heading', 'N/A')  # AIS heading if available
-                course = ship.get('Cog', 0)
-                speed = ship.get('Sog', 0)
-
-                # Calculate dimensions from AIS
-                dim = ship.get('Dimension', {})
-                length_m = dim.get('A', 0) + dim.get('B', 0)
-                beam_m = dim.get('C', 0) + dim.get('D', 0)
-                length_ft = length_m * 3.28084
-                beam_ft = beam_m * 3.28084
-
-                st.markdown(f"• **Type:** {ship_type}")
-                if heading != 'N/A':
-                    st.markdown(f"• **Speed:** {speed:.1f} knots | **Course:** {course:.1f}° | **Heading:** {heading}°")
-                else:
-                    st.markdown(f"• **Speed:** {speed:.1f} knots | **Course:** {course:.1f}°")
-
-                if length_ft > 0 and beam_ft > 0:
-                    st.markdown(f"• **Dimensions:** {length_ft:.0f} ft × {beam_ft:.0f} ft")
-                st.markdown(f"• **MMSI:** {ship['mmsi']}")
-
-                st.markdown("")
-
-                # ESTIMATED VESSEL PROPERTIES
-                st.markdown("**ESTIMATED VESSEL PROPERTIES**")
-                st.markdown(f"• **Displacement:** ~{analysis['dwt_tons']:,} tons *(estimated from dimensions)*")
-                st.markdown(f"• **Draft:** {analysis['vessel_draft_ft']:.0f} ft *(from AIS - crew reported)*")
-
-                st.markdown("---")
-
-                # CALCULATIONS
-                st.markdown("**CALCULATIONS**")
-
-                # Trajectory Analysis
-                st.markdown("**Trajectory Analysis**")
-                st.markdown(f"• Distance to bridge: {analysis['distance_from_bridge_nm']:.2f} nm")
-
-                # Simplify pier name display
-                pier_display = analysis['pier_name']
-
-                st.markdown(f"• Closest pier: {pier_display}")
-
-                # Approaching status
-                approaching = collision_risk.get('approaching', False)
-                speed_check = ship.get('Sog', 0)
-
-                if speed_check < 0.5:
-                    st.markdown(f"• Status: **Stationary**")
-                elif approaching:
-                    st.markdown(f"• Status: **Approaching bridge**")
-                else:
-                    st.markdown(f"• Status: **Moving away from bridge**")
-
-                # CPA
-                cpa_distance = collision_risk.get('cpa_distance_nm', 0)
-                st.markdown(f"• Will pass: {cpa_distance:.2f} nm from pier")
-
-                # Time to Arrival
-                if approaching:
-                    cpa_time = collision_risk.get('cpa_time_minutes', 0)
-                    st.markdown(f"• Time to Arrival: {cpa_time:.0f} minutes")
-                else:
-                    st.markdown(f"• Time to Arrival: Not applicable (moving away)")
-
-                # Grounding risk
-                ukc = analysis['ukc_ft']
-                depth = analysis['water_depth_ft']
-                draft = analysis['vessel_draft_ft']
-                if ukc >= 10:
-                    st.markdown(f"• Grounding risk: None (depth {depth:.0f} ft, draft {draft:.0f} ft, clearance +{ukc:.0f} ft)")
-                elif ukc >= 0:
-                    st.markdown(f"• Grounding risk: Low (depth {depth:.0f} ft, draft {draft:.0f} ft, clearance +{ukc:.0f} ft)")
-                else:
-                    st.markdown(f"• Grounding risk: **Will ground** (depth {depth:.0f} ft, draft {draft:.0f} ft, deficit {ukc:.0f} ft)")
-
-                st.markdown("")
-
-                # Impact Assessment (only if won't ground)
-                if not analysis['will_ground']:
-                    st.markdown("**Impact Assessment** *(if collision occurs)*")
-                    st.markdown(f"• Vessel demand: {analysis['impact_force_kips']:,.0f} kips *(at current speed)*")
-                    st.markdown(f"• Pier lateral capacity: {analysis['pier_lateral_capacity_kips']:,} kips *(pending structural analysis)*")
-                    st.markdown(f"• Demand/Capacity ratio: {analysis['dc_ratio']:.2f}")
-
-                    # Can endanger bridge?
-                    if analysis['dc_ratio'] >= 1.0:
-                        st.markdown(f"• **Can endanger bridge at current speed?** ⚠️ **YES** (impact exceeds pier capacity)")
-                    else:
-                        st.markdown(f"• **Can endanger bridge at current speed?** ✓ No (impact within pier capacity)")
-                else:
-                    st.markdown("**Impact Assessment**")
-                    st.markdown("• Vessel will ground before reaching pier - no collision possible")
+        )
+
+        # Details for a single selected vessel
+        show_vessel_details(sorted_ships)
     else:
         st.info("No vessels detected in monitoring area")
 
@@ -0,0 +1,258 @@
+"""Regression tests for vessel_analysis: batch vs scalar paths, band edges and the monitoring-area filter"""
+import random
+
+import numpy as np
+
+import vessel_analysis as va
+
+PIERS = va.CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS
+
+
+def random_vessels(n, seed=0):
+    """Random AIS-like vessels around the bridge"""
+    rng = random.Random(seed)
+    ship_types = ['Cargo', 'Tanker', 'Passenger', 'Ferry', 'Unknown', 'Container Ship', 'Tug', None]
+    vessels = []
+    for i in range(n):
+        vessels.append({
+            'name': f'VESSEL {i}',
+            'mmsi': str(i),
+            'Latitude': va.BRIDGE_LAT + rng.uniform(-0.5, 0.5),
+            'Longitude': va.BRIDGE_LON + rng.uniform(-0.5, 0.5),
+            'Sog': rng.choice([0, 0.3, rng.uniform(0, 25)]),
+            'Cog': rng.uniform(0, 360),
+            'ShipType': rng.choice(ship_types),
+            'Dimension': rng.choice([{}, {'A': rng.randint(10, 200), 'B': rng.randint(5, 100), 'C': 10, 'D': 10}])
+        })
+    return vessels
+
+
+def scalar_analyze_vessel(ship_data):
+    """Per-vessel analysis built only from the scalar helpers (loop over every pier)"""
+    lat = ship_data['Latitude']
+    lon = ship_data['Longitude']
+    speed = ship_data.get('Sog', 0)
+    ship_type = ship_data.get('ShipType', 'Unknown')
+    dims = ship_data.get('Dimension', {})
+    length = dims.get('A', 0) + dims.get('B', 0) if dims else 0
+    width = dims.get('C', 0) + dims.get('D', 0) if dims else 0
+
+    closest_pier_id = min(PIERS, key=lambda pier_id: va.calculate_distance(
+        lat, lon, PIERS[pier_id]['lat'], PIERS[pier_id]['lon']))
+    pier = PIERS[closest_pier_id]
+
+    dwt = va.estimate_dwt_from_ais(ship_type, length, width)
+    draft = va.estimate_vessel_draft(dwt, ship_type)
+    will_ground, ukc = va.check_grounding_risk(draft, pier['water_depth_ft'])
+
+    if will_ground:
+        impact_force = 0
+        dc_ratio = 0
+        status = "GROUNDED"
+    else:
+        impact_force = va.calculate_impact_force_aashto(dwt, speed)
+        dc_ratio = va.calculate_dc_ratio(impact_force, pier['lateral_capacity_kips'])
+        status = va.assess_threat_level(dc_ratio)[0]
+
+    return {
+        'closest_pier_id': closest_pier_id,
+        'distance_to_pier_nm': va.calculate_distance(lat, lon, pier['lat'], pier['lon']),
+        'distance_from_bridge_nm': va.calculate_distance(lat, lon, va.BRIDGE_LAT, va.BRIDGE_LON),
+        'dwt_tons': dwt,
+        'vessel_draft_ft': draft,
+        'ukc_ft': ukc,
+        'will_ground': will_ground,
+        'impact_force_kips': impact_force,
+        'dc_ratio': dc_ratio,
+        'status': status
+    }
+
+
+def scalar_closest_point_of_approach(ship_lat, ship_lon, speed_knots, course_degrees, target_lat, target_lon):
+    """CPA search stepping minute by minute with predict_position and calculate_distance"""
+    current_distance = va.calculate_distance(ship_lat, ship_lon, target_lat, target_lon)
+    if speed_knots < 0.5:
+        return current_distance, 0, False
+
+    min_distance = current_distance
+    min_distance_time = 0
+    for t in range(1, 61):
+        future_lat, future_lon = va.predict_position(ship_lat, ship_lon, speed_knots, course_degrees, t)
+        future_distance = va.calculate_distance(future_lat, future_lon, target_lat, target_lon)
+
+        if future_distance < min_distance:
+            min_distance = future_distance
+            min_distance_time = t
+
+        if t > min_distance_time + 5 and future_distance > min_distance:
+            break
+
+    will_approach = (min_distance < current_distance) and (min_distance_time > 0)
+    return min_distance, min_distance_time, will_approach
+
+
+def test_analyze_vessels_matches_scalar_analysis():
+    vessels = random_vessels(500)
+    for ship, analysis in zip(vessels, va.analyze_vessels(vessels)):
+        expected = scalar_analyze_vessel(ship)
+        for key, value in expected.items():
+            if isinstance(value, float):
+                assert np.isclose(analysis[key], value, rtol=1e-9, atol=1e-9), (ship['name'], key)
+            else:
+                assert analysis[key] == value, (ship['name'], key)
+
+
+def test_analyze_vessel_is_single_vessel_batch():
+    vessels = random_vessels(20, seed=1)
+    assert [va.analyze_vessel(ship) for ship in vessels] == va.analyze_vessels(vessels)
+
+
+def test_analyze_vessels_empty():
+    assert va.analyze_vessels([]) == []
+
+
+def test_closest_point_of_approach_matches_minute_by_minute_search():
+    rng = random.Random(3)
+    for _ in range(2000):
+        ship = (va.BRIDGE_LAT + rng.uniform(-0.6, 0.6), va.BRIDGE_LON + rng.uniform(-0.6, 0.6),
+                rng.uniform(0, 40), rng.uniform(0, 360))
+        pier = PIERS[rng.choice(list(PIERS))]
+
+        distance, time, approach = va.calculate_closest_point_of_approach(*ship, pier['lat'], pier['lon'])
+        expected_distance, expected_time, expected_approach = scalar_closest_point_of_approach(
+            *ship, pier['lat'], pier['lon'])
+
+        assert np.isclose(distance, expected_distance, rtol=1e-9, atol=1e-9)
+        assert time == expected_time
+        assert approach == expected_approach
+
+
+def test_pier_ranking_matches_haversine_up_to_near_ties():
+    rng = np.random.default_rng(5)
+    lats = rng.uniform(va.BRIDGE_LAT - 0.7, va.BRIDGE_LAT + 0.7, 20000)
+    lons = rng.uniform(va.BRIDGE_LON - 0.7, va.BRIDGE_LON + 0.7, 20000)
+    pier_lats = np.array([pier['lat'] for pier in PIERS.values()])
+    pier_lons = np.array([pier['lon'] for pier in PIERS.values()])
+
+    ranked = va.find_closest_piers(np.radians(lats), np.radians(lons))
+    distances = np.array([[va.calculate_distance(lat, lon, pier_lat, pier_lon)
+                           for pier_lat, pier_lon in zip(pier_lats, pier_lons)]
+                          for lat, lon in zip(lats, lons)])
+    exact = distances.argmin(axis=1)
+
+    # Any disagreement must be a near-tie between two piers
+    rows = np.arange(len(lats))
+    assert np.all(distances[rows, ranked] - distances[rows, exact] < 1e-4)
+
+
+def test_threat_level_thresholds():
+    assert va.assess_threat_level(0.0)[0] == "NORMAL"
+    assert va.assess_threat_level(0.5)[0] == "WATCH"
+    assert va.assess_threat_level(0.75)[0] == "WARNING"
+    assert va.assess_threat_level(1.0)[0] == "CRITICAL"
+    assert va.assess_threat_level(float('inf'))[0] == "CRITICAL"
+    assert va.assess_threat_level(float('nan'))[0] == "NORMAL"
+
+
+def test_analyze_vessels_nan_speed_is_normal():
+    ship = dict(random_vessels(1)[0], Sog=float('nan'), Dimension={'A': 300, 'B': 50})
+    ship['Latitude'], ship['Longitude'] = va.BRIDGE_LAT, va.BRIDGE_LON
+    assert va.analyze_vessels([ship])[0]['status'] == "NORMAL"
+
+
+def test_predict_position_accepts_time_arrays():
+    times = np.arange(1, 61)
+    lats, lons = va.predict_position(va.BRIDGE_LAT, va.BRIDGE_LON, 12.5, 137.0, times)
+    for t, lat, lon in zip(times, lats, lons):
+        assert np.allclose((lat, lon), va.predict_position(va.BRIDGE_LAT, va.BRIDGE_LON, 12.5, 137.0, int(t)),
+                           rtol=1e-12, atol=0)
+
+
+def test_find_closest_pier_matches_scalar_search():
+    for ship in random_vessels(200, seed=7):
+        lat, lon = ship['Latitude'], ship['Longitude']
+        expected_id = min(PIERS, key=lambda pier_id: va.calculate_distance(
+            lat, lon, PIERS[pier_id]['lat'], PIERS[pier_id]['lon']))
+
+        pier_id, distance = va.find_closest_pier(lat, lon)
+
+        assert pier_id == expected_id
+        assert np.isclose(distance, va.calculate_distance(lat, lon, PIERS[pier_id]['lat'], PIERS[pier_id]['lon']),
+                          rtol=1e-9, atol=1e-9)
+        assert isinstance(distance, float)
+
+
+def test_analyze_vessel_arrays_match_dictionaries():
+    vessels = random_vessels(100, seed=2)
+    results = va.analyze_vessel_arrays(vessels)
+
+    assert results.dtype == va.ANALYSIS_DTYPE
+    for row, analysis in zip(results, va.analyze_vessels(vessels)):
+        assert list(PIERS)[row['closest_pier_index']] == analysis['closest_pier_id']
+        for field in ('distance_to_pier_nm', 'dwt_tons', 'vessel_draft_ft', 'ukc_ft', 'will_ground', 'dc_ratio'):
+            assert row[field] == analysis[field]
+    assert len(va.analyze_vessel_arrays([])) == 0
+
+
+def test_dwt_length_band_edges():
+    # Upper band edges are inclusive (length > threshold moves up a band)
+    expected = {1: 1000, 50: 1000, 51: 3000, 100: 3000, 101: 10000, 150: 10000, 151: 20000,
+                250: 20000, 251: 50000}
+    for length, dwt in expected.items():
+        assert va.estimate_dwt_from_ais('Cargo', length, 20) == dwt, length
+
+    vessels = [dict(random_vessels(1)[0], Dimension={'A': length, 'B': 0}) for length in expected]
+    assert [row['dwt_tons'] for row in va.analyze_vessel_arrays(vessels)] == list(expected.values())
+
+
+def test_dwt_ship_type_fallback():
+    expected = {'Cargo': 15000, 'Container Ship': 15000, 'Tanker': 20000, 'Passenger': 1000, 'Ferry': 1000,
+                'Tug': 5000, 'Unknown': 5000, None: 5000}
+    for ship_type, dwt in expected.items():
+        assert va.estimate_dwt_from_ais(ship_type, 0, 0) == dwt, ship_type
+
+    vessels = [dict(random_vessels(1)[0], ShipType=ship_type, Dimension={}) for ship_type in expected]
+    assert [row['dwt_tons'] for row in va.analyze_vessel_arrays(vessels)] == list(expected.values())
+
+
+def test_draft_dwt_band_edges():
+    expected = {1000: 10, 1001: 15, 5000: 15, 5001: 22, 10000: 22, 10001: 28, 20000: 28, 20001: 35,
+                50000: 35, 50001: 45}
+    for dwt, draft in expected.items():
+        assert va.estimate_vessel_draft(dwt, 'Cargo') == draft, dwt
+
+    # The batch reaches the 1000/5000/10000/20000/50000 edges through length bands and ship types
+    vessels = [dict(random_vessels(1)[0], ShipType=ship_type, Dimension=dims) for ship_type, dims in (
+        ('Ferry', {}), ('Cargo', {'A': 60, 'B': 0}), ('Tug', {}), ('Cargo', {'A': 120, 'B': 0}),
+        ('Cargo', {}), ('Tanker', {}), ('Cargo', {'A': 300, 'B': 0}))]
+    results = va.analyze_vessel_arrays(vessels)
+    assert results['dwt_tons'].tolist() == [1000, 3000, 5000, 10000, 15000, 20000, 50000]
+    assert results['vessel_draft_ft'].tolist() == [10, 15, 15, 22, 28, 28, 35]
+
+
+def test_threat_level_band_edges():
+    expected = {0.4999: "NORMAL", 0.5: "WATCH", 0.7499: "WATCH", 0.75: "WARNING", 0.9999: "WARNING",
+                1.0: "CRITICAL"}
+    for dc_ratio, status in expected.items():
+        assert va.assess_threat_level(dc_ratio)[0] == status, dc_ratio
+
+
+def test_filter_monitored_vessels():
+    edge = va.MONITORING_RADIUS_DEG
+    positions = {
+        'center': (va.BRIDGE_LAT, va.BRIDGE_LON),
+        'inside north edge': (va.BRIDGE_LAT + edge - 1e-9, va.BRIDGE_LON),
+        'inside west edge': (va.BRIDGE_LAT, va.BRIDGE_LON - edge + 1e-9),
+        'outside south edge': (va.BRIDGE_LAT - edge - 1e-9, va.BRIDGE_LON),
+        'outside east edge': (va.BRIDGE_LAT, va.BRIDGE_LON + edge + 1e-9),
+        'lat not available': (91, va.BRIDGE_LON),
+        'lon not available': (va.BRIDGE_LAT, 181),
+        'nan position': (float('nan'), float('nan')),
+        'missing position': (None, None),
+    }
+    vessels = [{'name': name, 'Latitude': lat, 'Longitude': lon} for name, (lat, lon) in positions.items()]
+    vessels.append({'name': 'no position keys'})
+
+    monitored = va.filter_monitored_vessels(vessels)
+
+    assert [ship['name'] for ship in monitored] == ['center', 'inside north edge', 'inside west edge']
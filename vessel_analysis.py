@@ -1,9 +1,17 @@
+import bisect
+import functools
 import math
 
+import numpy as np
+
 # Chesapeake Bay Bridge Eastbound location
 BRIDGE_LAT = 38.99334868251498
 BRIDGE_LON = -76.38219400260512
 
+# Monitoring area: box of +/- this many degrees around the bridge (~30 nm),
+# the same box update_ships.py subscribes to on AISStream
+MONITORING_RADIUS_DEG = 0.5
+
 # Chesapeake Bay Bridge Eastbound piers
 CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS = {
     'pier_1': {
@@ -148,43 +156,72 @@ CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS = {
     }
 }
 
+# Pier coordinates as arrays, precomputed for vectorized distance calculations
+_PIER_IDS = list(CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS)
+_PIER_LATS = np.array([p['lat'] for p in CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS.values()])
+_PIER_LONS = np.array([p['lon'] for p in CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS.values()])
+_PIER_LATS_RAD = np.radians(_PIER_LATS)
+_PIER_LONS_RAD = np.radians(_PIER_LONS)
+_PIER_LATS_RAD_LIST = _PIER_LATS_RAD.tolist()
+_PIER_LONS_RAD_LIST = _PIER_LONS_RAD.tolist()
+_PIER_COS_LATS = np.cos(_PIER_LATS_RAD)
+_PIER_COS_LATS_LIST = _PIER_COS_LATS.tolist()
+_PIER_INDEXES = {pier_id: i for i, pier_id in enumerate(_PIER_IDS)}
+_PIER_WATER_DEPTHS = np.array([p['water_depth_ft'] for p in CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS.values()])
+_PIER_CAPACITIES = np.array([p['lateral_capacity_kips'] for p in CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS.values()])
+
+# Vessel length thresholds (m) and the DWT (tons) of each band between them
+_DWT_LENGTH_THRESHOLDS = (50, 100, 150, 250)
+_DWTS_BY_LENGTH = (1000, 3000, 10000, 20000, 50000)
+
+# DWT thresholds (tons) and the draft (ft) of each band between them
+_DRAFT_DWT_THRESHOLDS = (1000, 5000, 10000, 20000, 50000)
+_DRAFTS_FT = (10, 15, 22, 28, 35, 45)
+
+# Bridge location in radians
+_BRIDGE_LAT_RAD = math.radians(BRIDGE_LAT)
+_BRIDGE_LON_RAD = math.radians(BRIDGE_LON)
+_BRIDGE_COS_LAT = math.cos(_BRIDGE_LAT_RAD)
+
+# Pier terms for ranking piers in float32: offsets from the bridge are
+# small, so float32 keeps them to well under a metre
+_PIER_DLATS_RAD32 = (_PIER_LATS_RAD - _BRIDGE_LAT_RAD).astype(np.float32)
+_PIER_DLONS_RAD32 = (_PIER_LONS_RAD - _BRIDGE_LON_RAD).astype(np.float32)
+_PIER_COS_HALF_LATS32 = np.cos(_PIER_LATS_RAD / 2).astype(np.float32)
+_PIER_SIN_HALF_LATS32 = np.sin(_PIER_LATS_RAD / 2).astype(np.float32)
+
+# D/C ratio thresholds and the threat levels they separate (lowest first)
+_DC_THRESHOLDS = (0.50, 0.75, 1.0)
+_THREAT_LEVELS = (
+    ("NORMAL", "🟢", "Impact within safe limits"),
+    ("WATCH", "🟡", "Significant lateral impact force"),
+    ("WARNING", "🟠", "Impact approaching lateral capacity"),
+    ("CRITICAL", "🔴", "Impact exceeds lateral pier capacity"),
+)
+
+@functools.lru_cache(maxsize=None)
+def estimate_dwt_from_ship_type(ship_type):
+    """Estimate vessel DWT from AIS ship type alone (cached - ship types are a small set)"""
+    ship_type_upper = str(ship_type).upper()
+    if "CARGO" in ship_type_upper or "CONTAINER" in ship_type_upper:
+        return 15000
+    elif "TANKER" in ship_type_upper:
+        return 20000
+    elif "PASSENGER" in ship_type_upper or "FERRY" in ship_type_upper:
+        return 1000
+    else:
+        return 5000
+
 def estimate_dwt_from_ais(ship_type, length, width):
     """Estimate vessel DWT based on AIS data"""
     if length is None or length == 0:
-        if "CARGO" in str(ship_type).upper() or "CONTAINER" in str(ship_type).upper():
-            return 15000
-        elif "TANKER" in str(ship_type).upper():
-            return 20000
-        elif "PASSENGER" in str(ship_type).upper() or "FERRY" in str(ship_type).upper():
-            return 1000
-        else:
-            return 5000
-
-    if length > 250:
-        return 50000
-    elif length > 150:
-        return 20000
-    elif length > 100:
-        return 10000
-    elif length > 50:
-        return 3000
-    else:
-        return 1000
+        return estimate_dwt_from_ship_type(ship_type)
+
+    return _DWTS_BY_LENGTH[bisect.bisect_left(_DWT_LENGTH_THRESHOLDS, length)]
 
 def estimate_vessel_draft(dwt_tons, ship_type):
     """Estimate vessel draft based on DWT"""
-    if dwt_tons > 50000:
-        return 45
-    elif dwt_tons > 20000:
-        return 35
-    elif dwt_tons > 10000:
-        return 28
-    elif dwt_tons > 5000:
-        return 22
-    elif dwt_tons > 1000:
-        return 15
-    else:
-        return 10
+    return _DRAFTS_FT[bisect.bisect_left(_DRAFT_DWT_THRESHOLDS, dwt_tons)]
 
 def check_grounding_risk(vessel_draft_ft, water_depth_ft):
     """
@@ -217,44 +254,136 @@ def calculate_dc_ratio(impact_force_kips, pier_capacity_kips):
 
 def assess_threat_level(dc_ratio):
     """Assess threat based on D/C ratio"""
-    if dc_ratio >= 1.0:
-        return "CRITICAL", "🔴", "Impact exceeds lateral pier capacity"
-    elif dc_ratio >= 0.75:
-        return "WARNING", "🟠", "Impact approaching lateral capacity"
-    elif dc_ratio >= 0.50:
-        return "WATCH", "🟡", "Significant lateral impact force"
-    else:
-        return "NORMAL", "🟢", "Impact within safe limits"
+    # Count of thresholds reached (>=), so a NaN ratio stays NORMAL
+    return _THREAT_LEVELS[sum(dc_ratio >= threshold for threshold in _DC_THRESHOLDS)]
 
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Haversine formula - distance in nautical miles"""
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
+def _haversine_rad(lat1_rad, lon1_rad, lat2_rad, lon2_rad, cos_lat2):
+    """
+    Haversine formula on coordinates already in radians - distance in nautical miles
 
+    cos_lat2 is cos(lat2_rad), passed in so distances to piers and the
+    bridge reuse the cosines precomputed at import.
+    """
     dlat = lat2_rad - lat1_rad
     dlon = lon2_rad - lon1_rad
 
-    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
+    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * cos_lat2 * math.sin(dlon/2)**2
     c = 2 * math.asin(math.sqrt(a))
 
     radius_nm = 3440.065
     distance = radius_nm * c
     return distance
 
+def _haversines_rad(lats1_rad, lons1_rad, lats2_rad, lons2_rad, cos_lats2):
+    """Haversine formula on NumPy arrays in radians (element-wise, broadcasting), as _haversine_rad"""
+    dlat = lats2_rad - lats1_rad
+    dlon = lons2_rad - lons1_rad
+
+    a = np.sin(dlat/2)**2 + np.cos(lats1_rad) * cos_lats2 * np.sin(dlon/2)**2
+    c = 2 * np.arcsin(np.sqrt(a))
+
+    radius_nm = 3440.065
+    return radius_nm * c
+
+def calculate_distance(lat1, lon1, lat2, lon2):
+    """Haversine formula - distance in nautical miles"""
+    lat2_rad = math.radians(lat2)
+    return _haversine_rad(math.radians(lat1), math.radians(lon1), lat2_rad, math.radians(lon2), math.cos(lat2_rad))
+
+def filter_monitored_vessels(ships_data):
+    """
+    Keep only vessels positioned inside the monitoring area
+
+    A cheap bounding-box check on the whole batch, done before any
+    distance calculations. Also drops vessels without a usable position
+    (missing, or the AIS "not available" values 91/181).
+
+    Args:
+        ships_data: List of vessel AIS data dictionaries
+
+    Returns:
+        monitored: List of the vessels inside the monitoring area, in input order
+    """
+    lats = np.array([ship.get('Latitude') for ship in ships_data], dtype=float)
+    lons = np.array([ship.get('Longitude') for ship in ships_data], dtype=float)
+
+    # NaN (missing position) fails both comparisons
+    in_area = ((np.abs(lats - BRIDGE_LAT) <= MONITORING_RADIUS_DEG) &
+               (np.abs(lons - BRIDGE_LON) <= MONITORING_RADIUS_DEG))
+
+    return [ship for ship, keep in zip(ships_data, in_area) if keep]
+
+def find_closest_piers(lats_rad, lons_rad):
+    """
+    Determine which pier is closest to each vessel
+
+    Piers are ranked by the equirectangular approximation (squared x/y
+    offsets scaled by the cosine of the mid-latitude), which orders them
+    the same as the haversine distance at bridge scales without any
+    sin/asin/sqrt per pier. Positions are taken relative to the bridge
+    and ranked in float32, halving the size of the (vessels, piers)
+    arrays.
+
+    Args:
+        lats_rad, lons_rad: Vessel position(s) in radians (scalars or arrays)
+
+    Returns:
+        closest_indices: Index into the pier table for each vessel
+    """
+    lats_rad = np.asarray(lats_rad)
+    lons_rad = np.asarray(lons_rad)
+    dlats = (lats_rad - _BRIDGE_LAT_RAD).astype(np.float32)[..., None]
+    dlons = (lons_rad - _BRIDGE_LON_RAD).astype(np.float32)[..., None]
+    half_lats = (lats_rad / 2).astype(np.float32)[..., None]
+
+    # cos((lat + pier_lat) / 2) expanded with precomputed pier half-angle terms
+    cos_mid_lat = np.cos(half_lats) * _PIER_COS_HALF_LATS32 - np.sin(half_lats) * _PIER_SIN_HALF_LATS32
+
+    dx = (_PIER_DLONS_RAD32 - dlons) * cos_mid_lat
+    dy = _PIER_DLATS_RAD32 - dlats
+    return np.argmin(dx*dx + dy*dy, axis=-1)
+
 def find_closest_pier(lat, lon):
     """Determine which pier is closest to vessel"""
-    min_distance = float('inf')
-    closest_pier = None
+    lat_rad = math.radians(lat)
+    lon_rad = math.radians(lon)
+    closest_index = int(find_closest_piers(lat_rad, lon_rad))
 
-    for pier_id, pier_data in CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS.items():
-        distance = calculate_distance(lat, lon, pier_data['lat'], pier_data['lon'])
-        if distance < min_distance:
-            min_distance = distance
-            closest_pier = pier_id
+    # Full haversine distance only for the selected pier
+    min_distance = _haversine_rad(lat_rad, lon_rad, _PIER_LATS_RAD_LIST[closest_index],
+                                  _PIER_LONS_RAD_LIST[closest_index], _PIER_COS_LATS_LIST[closest_index])
+    return _PIER_IDS[closest_index], min_distance
 
-    return closest_pier, min_distance
+def _analysis_result(closest_pier_id, distance_to_pier, distance_from_bridge, dwt, draft, water_depth, ukc,
+                     will_ground, impact_force, capacity, dc_ratio, threat_level):
+    """Assemble the analysis dictionary, with status text for grounding or the threat level"""
+    if will_ground:
+        status = "GROUNDED"
+        emoji = "⚓"
+        description = f"Vessel will ground before pier (UKC deficit: {abs(ukc):.1f} ft)"
+    else:
+        status, emoji, description = threat_level
+
+        if ukc < 5:
+            description += f" | Marginal clearance (UKC: {ukc:+.1f} ft)"
+
+    return {
+        'closest_pier_id': closest_pier_id,
+        'pier_name': CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS[closest_pier_id]['name'],
+        'distance_to_pier_nm': distance_to_pier,
+        'distance_from_bridge_nm': distance_from_bridge,
+        'dwt_tons': dwt,
+        'vessel_draft_ft': draft,
+        'water_depth_ft': water_depth,
+        'ukc_ft': ukc,
+        'will_ground': will_ground,
+        'impact_force_kips': impact_force,
+        'pier_lateral_capacity_kips': capacity,
+        'dc_ratio': dc_ratio,
+        'status': status,
+        'emoji': emoji,
+        'description': description
+    }
 
 def analyze_vessel(ship_data):
     """Complete vessel analysis"""
@@ -269,7 +398,8 @@ def analyze_vessel(ship_data):
 
     closest_pier_id, distance_to_pier = find_closest_pier(lat, lon)
     pier = CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS[closest_pier_id]
-    distance_from_bridge = calculate_distance(lat, lon, BRIDGE_LAT, BRIDGE_LON)
+    distance_from_bridge = _haversine_rad(math.radians(lat), math.radians(lon),
+                                          _BRIDGE_LAT_RAD, _BRIDGE_LON_RAD, _BRIDGE_COS_LAT)
 
     dwt = estimate_dwt_from_ais(ship_type, length, width)
     draft = estimate_vessel_draft(dwt, ship_type)
@@ -278,54 +408,138 @@ def analyze_vessel(ship_data):
     if will_ground:
         impact_force = 0
         dc_ratio = 0
-        status = "GROUNDED"
-        emoji = "⚓"
-        description = f"Vessel will ground before pier (UKC deficit: {abs(ukc):.1f} ft)"
     else:
         impact_force = calculate_impact_force_aashto(dwt, speed)
         dc_ratio = calculate_dc_ratio(impact_force, pier['lateral_capacity_kips'])
-        status, emoji, description = assess_threat_level(dc_ratio)
 
-        if ukc < 5:
-            description += f" | Marginal clearance (UKC: {ukc:+.1f} ft)"
+    return _analysis_result(closest_pier_id, distance_to_pier, distance_from_bridge, dwt, draft,
+                            pier['water_depth_ft'], ukc, will_ground, impact_force,
+                            pier['lateral_capacity_kips'], dc_ratio, assess_threat_level(dc_ratio))
+
+# Batch analysis results, one column per field. Text fields (pier name,
+# status, emoji, description) are derived from the pier and threat level
+# indexes when rows are converted to dictionaries.
+ANALYSIS_DTYPE = np.dtype([
+    ('closest_pier_index', 'u1'),
+    ('distance_to_pier_nm', 'f8'),
+    ('distance_from_bridge_nm', 'f8'),
+    ('dwt_tons', 'i4'),
+    ('vessel_draft_ft', 'i2'),
+    ('water_depth_ft', 'i2'),
+    ('ukc_ft', 'i2'),
+    ('will_ground', '?'),
+    ('impact_force_kips', 'f8'),
+    ('pier_lateral_capacity_kips', 'i4'),
+    ('dc_ratio', 'f8'),
+    ('threat_level_index', 'u1'),
+])
+
+def analyze_vessel_arrays(ships_data):
+    """
+    Complete vessel analysis for a batch of vessels at once
 
-    return {
-        'closest_pier_id': closest_pier_id,
-        'pier_name': pier['name'],
-        'distance_to_pier_nm': distance_to_pier,
-        'distance_from_bridge_nm': distance_from_bridge,
-        'dwt_tons': dwt,
-        'vessel_draft_ft': draft,
-        'water_depth_ft': pier['water_depth_ft'],
-        'ukc_ft': ukc,
-        'will_ground': will_ground,
-        'impact_force_kips': impact_force,
-        'pier_lateral_capacity_kips': pier['lateral_capacity_kips'],
-        'dc_ratio': dc_ratio,
-        'status': status,
-        'emoji': emoji,
-        'description': description
-    }
+    Distances, impact forces and D/C ratios are computed on NumPy arrays
+    for the whole batch instead of vessel by vessel.
 
-def predict_position(lat, lon, speed_knots, course_degrees, time_minutes):
+    Args:
+        ships_data: List of vessel AIS data dictionaries
+
+    Returns:
+        results: Structured array of ANALYSIS_DTYPE, one row per vessel in input order
     """
-    Predict vessel position after given time
+    n = len(ships_data)
+    results = np.zeros(n, dtype=ANALYSIS_DTYPE)
+    if n == 0:
+        return results
+
+    lats = np.empty(n)
+    lons = np.empty(n)
+    speeds = np.empty(n)
+    lengths = np.empty(n)
+    type_dwts = np.zeros(n, dtype=int)
+
+    for i, ship_data in enumerate(ships_data):
+        dims = ship_data.get('Dimension', {})
+        length = dims.get('A', 0) + dims.get('B', 0) if dims else 0
+
+        lats[i] = ship_data.get('Latitude')
+        lons[i] = ship_data.get('Longitude')
+        speeds[i] = ship_data.get('Sog', 0)
+        lengths[i] = length
+        if length == 0:
+            type_dwts[i] = estimate_dwt_from_ship_type(ship_data.get('ShipType', 'Unknown'))
+
+    # DWT from length bands, falling back to ship type when length is unknown
+    length_dwts = np.take(_DWTS_BY_LENGTH, np.searchsorted(_DWT_LENGTH_THRESHOLDS, lengths, side='left'))
+    dwts = np.where(lengths == 0, type_dwts, length_dwts)
+
+    # Draft band lookup for the whole batch
+    drafts = np.take(_DRAFTS_FT, np.searchsorted(_DRAFT_DWT_THRESHOLDS, dwts, side='left'))
+
+    # Rank every pier for every vessel in one pass, then measure only the closest
+    lats_rad = np.radians(lats)
+    lons_rad = np.radians(lons)
+    closest_indices = find_closest_piers(lats_rad, lons_rad)
+    results['closest_pier_index'] = closest_indices
+    results['distance_to_pier_nm'] = _haversines_rad(lats_rad, lons_rad, _PIER_LATS_RAD[closest_indices],
+                                                     _PIER_LONS_RAD[closest_indices], _PIER_COS_LATS[closest_indices])
+    results['distance_from_bridge_nm'] = _haversines_rad(lats_rad, lons_rad, _BRIDGE_LAT_RAD, _BRIDGE_LON_RAD,
+                                                         _BRIDGE_COS_LAT)
+
+    # Grounding check against the closest pier
+    capacities = _PIER_CAPACITIES[closest_indices]
+    water_depths = _PIER_WATER_DEPTHS[closest_indices]
+    will_ground, ukcs = check_grounding_risk(drafts, water_depths)
+
+    # AASHTO impact force and D/C ratio (zero for vessels that will ground)
+    impact_forces = np.where(will_ground, 0.0, calculate_impact_force_aashto(dwts, speeds))
+    dc_ratios = np.divide(impact_forces, capacities, out=np.zeros(n), where=capacities != 0)
+
+    results['dwt_tons'] = dwts
+    results['vessel_draft_ft'] = drafts
+    results['water_depth_ft'] = water_depths
+    results['ukc_ft'] = ukcs
+    results['will_ground'] = will_ground
+    results['impact_force_kips'] = impact_forces
+    results['pier_lateral_capacity_kips'] = capacities
+    results['dc_ratio'] = dc_ratios
+    results['threat_level_index'] = np.sum(dc_ratios[:, None] >= _DC_THRESHOLDS, axis=1)
+
+    return results
+
+def analyses_from_arrays(results):
+    """
+    Convert batch analysis results to analysis dictionaries
 
     Args:
-        lat: Current latitude (degrees)
-        lon: Current longitude (degrees)
-        speed_knots: Vessel speed (knots)
-        course_degrees: Vessel course (degrees, 0-360)
-        time_minutes: Time ahead to predict (minutes)
+        results: Structured array of ANALYSIS_DTYPE (from analyze_vessel_arrays)
 
     Returns:
-        predicted_lat, predicted_lon: Future position
+        analyses: List of analysis dictionaries (same as analyze_vessel), in row order
     """
-    # Convert to radians
-    lat_rad = math.radians(lat)
-    lon_rad = math.radians(lon)
-    course_rad = math.radians(course_degrees)
+    analyses = []
+    for row in results.tolist():
+        closest_pier_index = row[0]
+        threat_level_index = row[-1]
+        analyses.append(_analysis_result(_PIER_IDS[closest_pier_index], *row[1:-1],
+                                         _THREAT_LEVELS[threat_level_index]))
+
+    return analyses
+
+def analyze_vessels(ships_data):
+    """
+    Complete vessel analysis for a batch of vessels at once
 
+    Args:
+        ships_data: List of vessel AIS data dictionaries
+
+    Returns:
+        analyses: List of analysis dictionaries (same as analyze_vessel), in input order
+    """
+    return analyses_from_arrays(analyze_vessel_arrays(ships_data))
+
+def _predict_position_rad(lat_rad, lon_rad, speed_knots, course_rad, time_minutes):
+    """Dead-reckoning position in radians"""
     # Distance traveled in nautical miles
     distance_nm = speed_knots * (time_minutes / 60.0)
 
@@ -345,11 +559,51 @@ def predict_position(lat, lon, speed_knots, course_degrees, time_minutes):
         math.cos(d_over_r) - math.sin(lat_rad) * math.sin(new_lat_rad)
     )
 
-    # Convert back to degrees
-    new_lat = math.degrees(new_lat_rad)
-    new_lon = math.degrees(new_lon_rad)
+    return new_lat_rad, new_lon_rad
+
+def _predict_positions_rad(lat_rad, lon_rad, speed_knots, course_rad, times_minutes):
+    """Dead-reckoning positions in radians for a NumPy array of times"""
+    earth_radius_nm = 3440.065
+    d_over_r = speed_knots * (times_minutes / 60.0) / earth_radius_nm
+    sin_d = np.sin(d_over_r)
+    cos_d = np.cos(d_over_r)
+
+    # Vessel and course terms are the same for every time step
+    sin_lat = math.sin(lat_rad)
+    cos_lat = math.cos(lat_rad)
 
-    return new_lat, new_lon
+    new_lats_rad = np.arcsin(sin_lat * cos_d + cos_lat * sin_d * math.cos(course_rad))
+    new_lons_rad = lon_rad + np.arctan2(math.sin(course_rad) * sin_d * cos_lat,
+                                        cos_d - sin_lat * np.sin(new_lats_rad))
+
+    return new_lats_rad, new_lons_rad
+
+def predict_position(lat, lon, speed_knots, course_degrees, time_minutes):
+    """
+    Predict vessel position after given time
+
+    Args:
+        lat: Current latitude (degrees)
+        lon: Current longitude (degrees)
+        speed_knots: Vessel speed (knots)
+        course_degrees: Vessel course (degrees, 0-360)
+        time_minutes: Time ahead to predict (minutes, number or NumPy array)
+
+    Returns:
+        predicted_lat, predicted_lon: Future position (floats, or arrays for an array of times)
+    """
+    lat_rad = math.radians(lat)
+    lon_rad = math.radians(lon)
+    course_rad = math.radians(course_degrees)
+
+    if isinstance(time_minutes, np.ndarray):
+        new_lats_rad, new_lons_rad = _predict_positions_rad(lat_rad, lon_rad, speed_knots, course_rad, time_minutes)
+        return np.degrees(new_lats_rad), np.degrees(new_lons_rad)
+
+    new_lat_rad, new_lon_rad = _predict_position_rad(lat_rad, lon_rad, speed_knots, course_rad, time_minutes)
+
+    # Convert back to degrees
+    return math.degrees(new_lat_rad), math.degrees(new_lon_rad)
 
 def calculate_closest_point_of_approach(ship_lat, ship_lon, speed_knots, course_degrees,
                                        target_lat, target_lon):
@@ -367,29 +621,35 @@ def calculate_closest_point_of_approach(ship_lat, ship_lon, speed_knots, course_
         cpa_time_minutes: Time until CPA (minutes)
         will_approach: Boolean - is vessel getting closer?
     """
+    lat_rad = math.radians(ship_lat)
+    lon_rad = math.radians(ship_lon)
+    target_lat_rad = math.radians(target_lat)
+    target_lon_rad = math.radians(target_lon)
+    cos_target_lat = math.cos(target_lat_rad)
+
     # If ship is stationary, CPA is current distance
     if speed_knots < 0.5:
-        current_distance = calculate_distance(ship_lat, ship_lon, target_lat, target_lon)
+        current_distance = _haversine_rad(lat_rad, lon_rad, target_lat_rad, target_lon_rad, cos_target_lat)
         return current_distance, 0, False
 
     # Calculate positions at future time intervals
-    current_distance = calculate_distance(ship_lat, ship_lon, target_lat, target_lon)
+    current_distance = _haversine_rad(lat_rad, lon_rad, target_lat_rad, target_lon_rad, cos_target_lat)
     min_distance = current_distance
     min_distance_time = 0
 
-    # Check distances at 1-minute intervals for next 60 minutes
-    for t in range(1, 61):
-        future_lat, future_lon = predict_position(ship_lat, ship_lon, speed_knots,
-                                                   course_degrees, t)
-        future_distance = calculate_distance(future_lat, future_lon, target_lat, target_lon)
+    # Check distances at 1-minute intervals for next 60 minutes, all at once
+    times = np.arange(1, 61)
+    future_lats_rad, future_lons_rad = _predict_positions_rad(lat_rad, lon_rad, speed_knots,
+                                                              math.radians(course_degrees), times)
+    future_distances = _haversines_rad(future_lats_rad, future_lons_rad, target_lat_rad, target_lon_rad,
+                                       cos_target_lat)
 
-        if future_distance < min_distance:
-            min_distance = future_distance
-            min_distance_time = t
-
-        # If distance starts increasing after decreasing, we've passed CPA
-        if t > min_distance_time + 5 and future_distance > min_distance:
-            break
+    # Distance along a straight course is unimodal, so the smallest sample
+    # is the CPA (if it beats the current distance)
+    closest_index = int(np.argmin(future_distances))
+    if future_distances[closest_index] < min_distance:
+        min_distance = float(future_distances[closest_index])
+        min_distance_time = int(times[closest_index])
 
     # Vessel is approaching if CPA is in the future and closer than current position
     will_approach = (min_distance < current_distance) and (min_distance_time > 0)
@@ -412,18 +672,23 @@ def predict_trajectory(ship_data, prediction_times=[5, 10, 15]):
     speed = ship_data.get('Sog', 0)
     course = ship_data.get('Cog', 0)
 
+    lat_rad = math.radians(lat)
+    lon_rad = math.radians(lon)
+    course_rad = math.radians(course)
+
     trajectory = []
 
     for t in prediction_times:
-        pred_lat, pred_lon = predict_position(lat, lon, speed, course, t)
+        pred_lat_rad, pred_lon_rad = _predict_position_rad(lat_rad, lon_rad, speed, course_rad, t)
 
         # Calculate distance to bridge at predicted position
-        distance_to_bridge = calculate_distance(pred_lat, pred_lon, BRIDGE_LAT, BRIDGE_LON)
+        distance_to_bridge = _haversine_rad(pred_lat_rad, pred_lon_rad, _BRIDGE_LAT_RAD, _BRIDGE_LON_RAD,
+                                            _BRIDGE_COS_LAT)
 
         trajectory.append({
             'time_minutes': t,
-            'latitude': pred_lat,
-            'longitude': pred_lon,
+            'latitude': math.degrees(pred_lat_rad),
+            'longitude': math.degrees(pred_lon_rad),
             'distance_to_bridge_nm': distance_to_bridge
         })
 
@@ -448,6 +713,7 @@ def assess_collision_risk(ship_data, analysis):
     # Find CPA to closest pier
     closest_pier_id = analysis['closest_pier_id']
     pier = CHESAPEAKE_BAY_BRIDGE_EASTBOUND_PIERS[closest_pier_id]
+    pier_index = _PIER_INDEXES[closest_pier_id]
     distance_to_pier = analysis['distance_to_pier_nm']
 
     cpa_distance, cpa_time, will_approach = calculate_closest_point_of_approach(
@@ -460,8 +726,11 @@ def assess_collision_risk(ship_data, analysis):
 
     # Check if vessel is approaching (getting closer to bridge)
     if speed > 0.5:
-        future_lat, future_lon = predict_position(lat, lon, speed, course, 5)
-        future_distance = calculate_distance(future_lat, future_lon, pier['lat'], pier['lon'])
+        future_lat_rad, future_lon_rad = _predict_position_rad(math.radians(lat), math.radians(lon), speed,
+                                                               math.radians(course), 5)
+        future_distance = _haversine_rad(future_lat_rad, future_lon_rad,
+                                         _PIER_LATS_RAD_LIST[pier_index], _PIER_LONS_RAD_LIST[pier_index],
+                                         _PIER_COS_LATS_LIST[pier_index])
         approaching = future_distance < distance_to_pier
     else:
         approaching = False